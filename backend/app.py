@@ -1,40 +1,232 @@
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
-import json
+import orjson
+import heapq
+import itertools
 from collections import deque
+from operator import itemgetter
 import paho.mqtt.client as mqtt
+import logging
+import os
+import queue
 import threading
-from datetime import datetime
+import time
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify()"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# In-memory stores (thread-safe)
+class RWLock:
+    """Reader-writer lock: many concurrent readers or a single writer.
+
+    Waiting writers block new readers so a steady stream of API reads
+    cannot starve MQTT ingest.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read_lock(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write_lock(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+# Size limits
+SENSOR_DATA_MAXLEN = 10000
+ALARMS_MAXLEN = 1000
+PENDING_UPDATES_MAXLEN = 10000
+
+# In-memory stores (thread-safe). The containers below are created once and
+# only ever mutated in place, never rebound, so hot paths can safely bind them
+# to locals.
 # sensors: sensor_id -> {sensor_id, sensor_type, location, status}
 sensors = {}
-# sensor_data: sensor_id -> deque of {'value', 'timestamp'} (bounded)
+# number of sensors whose status is 'active'
+active_sensor_count = 0
+# serialized /api/sensors response; None until rebuilt after a sensor is added
+sensors_response_cache = None
+# sensor_data: sensor_id -> RingBuf of (value, timestamp) readings (bounded)
 sensor_data = {}
-# alarms: deque of {'id', 'sensor_id', 'alarm_type', 'level', 'message', 'timestamp', 'acknowledged'} (bounded)
-alarms = None
+# unack_alarms / ack_alarms: deques of {'id', 'sensor_id', 'alarm_type', 'level', 'message',
+# 'timestamp' (epoch ns), 'acknowledged'}, newest (highest id) first; together bounded
+# by ALARMS_MAXLEN
+unack_alarms = deque(maxlen=ALARMS_MAXLEN)
+ack_alarms = deque(maxlen=ALARMS_MAXLEN)
+# alarms_by_id: alarm id -> alarm dict (same objects as in the deques above)
+alarms_by_id = {}
+# readings received since local midnight (reset on date rollover)
+today_readings_count = 0
+# epoch-ns bounds of the current local day, recomputed only at rollover
+today_start_ns = 0
+tomorrow_start_ns = 0
 # simple alarm id counter
 alarm_id_counter = 1
-# lock to protect concurrent access
-data_lock = threading.Lock()
+# lock to protect concurrent access (API reads share it, ingest writes exclusively)
+data_lock = RWLock()
 
-# Size limits
-SENSOR_DATA_MAXLEN = 10000
-ALARMS_MAXLEN = 1000
+# one sensor reading: value plus epoch-ns timestamp
+READING_DTYPE = np.dtype([('value', 'f8'), ('ts_ns', 'i8')])
+
+class RingBuf:
+    """Fixed-capacity ring buffer of sensor readings.
+
+    Readings live in one preallocated NumPy structured array instead of
+    one dict per reading; the oldest reading is overwritten once the
+    buffer is full, so appends never allocate.
+    """
+
+    def __init__(self, capacity=SENSOR_DATA_MAXLEN):
+        self.buf = np.empty(capacity, dtype=READING_DTYPE)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value, ts_ns):
+        capacity = len(self.buf)
+        self.buf[self.head] = (value, ts_ns)
+        self.head = (self.head + 1) % capacity
+        self.count = min(self.count + 1, capacity)
+
+    def latest(self, n):
+        """Return copies of (values, ts_ns) for the newest n readings, newest first"""
+        n = max(0, min(n, self.count))
+        start = self.head - n
+        if start >= 0:
+            readings = self.buf[start:self.head][::-1].copy()
+        else:
+            # wrapped: tail of the array followed by its head
+            readings = np.concatenate((self.buf[start:], self.buf[:self.head]))[::-1]
+        return readings['value'], readings['ts_ns']
+
+# longest span format_timestamps formats with a single UTC offset; DST switches
+# are months apart, so equal offsets at both ends of a shorter span hold throughout
+SINGLE_OFFSET_SPAN_NS = 7 * 24 * 3600 * 1_000_000_000
+
+def reading_value(value):
+    """Coerce a payload value for the float64 ring buffer; NaN (served as null) if not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def utc_offset_ns(ts_ns):
+    """Return the local UTC offset in effect at an epoch-ns timestamp, in ns"""
+    offset = datetime.fromtimestamp(ts_ns // 1_000_000_000, timezone.utc).astimezone().utcoffset()
+    return int(offset.total_seconds()) * 1_000_000_000
+
+def format_timestamp(ts_ns):
+    """Format an epoch-ns timestamp as a local ISO 8601 string (microseconds, truncated)"""
+    secs, ns = divmod(ts_ns, 1_000_000_000)
+    return datetime.fromtimestamp(secs).replace(microsecond=ns // 1000).isoformat(timespec='microseconds')
+
+def format_timestamps(ts_ns):
+    """Format an array of epoch-ns timestamps like format_timestamp"""
+    if len(ts_ns) == 0:
+        return []
+    oldest, newest = int(ts_ns.min()), int(ts_ns.max())
+    offset = utc_offset_ns(oldest)
+    if newest - oldest > SINGLE_OFFSET_SPAN_NS or utc_offset_ns(newest) != offset:
+        # the span may cross a DST switch: format each value with its own offset
+        return [format_timestamp(t) for t in ts_ns.tolist()]
+    local = ts_ns + offset
+    return np.datetime_as_string(local.view('datetime64[ns]'), unit='us').tolist()
+
+# dashboard stats cached per STATS_CACHE_TTL-second bucket of time.monotonic(), so
+# concurrent dashboards polling in the same bucket share one result
+STATS_CACHE_TTL = 5.0
+stats_cache = {'bucket': None, 'value': None}
+
+# (topic, payload, ts_ns) MQTT messages waiting for the ingest worker
+INGEST_QUEUE_MAXSIZE = 10000
+ingest_queue = queue.Queue(maxsize=INGEST_QUEUE_MAXSIZE)
+# the worker stores up to INGEST_BATCH_MAX messages per data_lock acquisition,
+# waiting at most INGEST_BATCH_TIMEOUT seconds for a batch to fill
+INGEST_BATCH_MAX = 256
+INGEST_BATCH_TIMEOUT = 0.02
+
+# (event, data) WebSocket events waiting for the emit worker
+EMIT_QUEUE_MAXSIZE = 10000
+emit_queue = queue.Queue(maxsize=EMIT_QUEUE_MAXSIZE)
+
+# (sensor_id, data, ts_ns) updates waiting to be broadcast as one 'sensor_update_batch' event
+pending_updates = deque(maxlen=PENDING_UPDATES_MAXLEN)
+pending_lock = threading.Lock()
+# how often pending sensor updates are flushed to clients (seconds)
+UPDATE_FLUSH_INTERVAL = 0.15
+
+def day_bounds_ns(ts_ns):
+    """Return epoch-ns (start, end) of the local day containing ts_ns"""
+    day = datetime.fromtimestamp(ts_ns / 1e9).date()
+    start = datetime.combine(day, datetime.min.time())
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time())
+    return int(start.timestamp()) * 1_000_000_000, int(end.timestamp()) * 1_000_000_000
 
 def init_data():
     """Initialize in-memory data stores."""
-    global sensors, sensor_data, alarms, alarm_id_counter
-    with data_lock:
-        sensors = {}
-        sensor_data = {}
-        alarms = deque(maxlen=ALARMS_MAXLEN)
+    global alarm_id_counter, active_sensor_count, sensors_response_cache
+    global today_readings_count, today_start_ns, tomorrow_start_ns
+    with data_lock.write_lock():
+        sensors.clear()
+        sensors_response_cache = None
+        active_sensor_count = 0
+        sensor_data.clear()
+        today_readings_count = 0
+        today_start_ns, tomorrow_start_ns = day_bounds_ns(time.time_ns())
+        unack_alarms.clear()
+        ack_alarms.clear()
+        alarms_by_id.clear()
         alarm_id_counter = 1
+        stats_cache['value'] = None
 
 # MQTT Configuration
 MQTT_BROKER = "localhost"
@@ -43,94 +235,198 @@ MQTT_TOPICS = ["sensors/+/data", "alarms/+"]
 
 # MQTT Callbacks
 def on_connect(client, userdata, flags, rc):
-    print(f"Connected to MQTT broker with result code {rc}")
+    logger.info("Connected to MQTT broker with result code %s", rc)
     for topic in MQTT_TOPICS:
         client.subscribe(topic)
 
 def on_message(client, userdata, msg):
     try:
-        topic = msg.topic
-        payload = json.loads(msg.payload.decode())
-        print(f"Received MQTT message on topic: {topic}, payload: {payload}")
-        
-        if topic.startswith("sensors/"):
-            # Handle sensor data
-            sensor_id = topic.split("/")[1]
-            handle_sensor_data(sensor_id, payload)
-        elif topic.startswith("alarms/"):
-            # Handle alarms
-            sensor_id = topic.split("/")[1]
-            handle_alarm(sensor_id, payload)
-            
+        ts_ns = time.time_ns()
+        payload = orjson.loads(msg.payload)
+        logger.debug("Received MQTT message on topic: %s, payload: %s", msg.topic, payload)
+        # Hand off to the ingest worker so paho's network loop is not blocked
+        ingest_queue.put((msg.topic, payload, ts_ns))
     except Exception as e:
-        print(f"Error processing MQTT message: {e}")
-        print(f"Topic: {msg.topic}, Raw payload: {msg.payload}")
+        logger.warning("Error processing MQTT message: %s (topic: %s, raw payload: %r)", e, msg.topic, msg.payload)
 
-def handle_sensor_data(sensor_id, data):
-    """Store sensor data in memory and emit to frontend"""
-    global sensors, sensor_data
-    timestamp = datetime.now().isoformat()
-    new_sensor_meta = None
-    with data_lock:
-        # Insert or update sensor
-        if sensor_id not in sensors:
-            sensors[sensor_id] = {
-                'sensor_id': sensor_id,
-                'sensor_type': data.get('type', 'unknown'),
-                'location': data.get('location', 'unknown'),
-                'status': 'active'
-            }
-            # capture metadata to broadcast after releasing lock
-            new_sensor_meta = sensors[sensor_id].copy()
-
-        # Append sensor data into a bounded deque
-        if sensor_id not in sensor_data:
-            sensor_data[sensor_id] = deque(maxlen=SENSOR_DATA_MAXLEN)
-        sensor_data[sensor_id].append({
-            'value': data.get('value', 0),
-            'timestamp': timestamp
+def drain_ingest_queue(max_items=INGEST_BATCH_MAX, timeout=INGEST_BATCH_TIMEOUT):
+    """Block for the next queued message, then collect more for up to `timeout` seconds"""
+    batch = [ingest_queue.get()]
+    deadline = time.monotonic() + timeout
+    while len(batch) < max_items:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(ingest_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def process_ingest_batch(batch):
+    """Store a batch of (topic, payload, ts_ns) messages under one lock and notify frontend"""
+    updates = []
+    new_sensors = []
+    new_alarms = []
+    # bind per-message callees to locals once per batch
+    store_sensor_data = handle_sensor_data
+    store_alarm = handle_alarm
+    with data_lock.write_lock():
+        for topic, payload, ts_ns in batch:
+            try:
+                # Topics are "sensors/{id}/data" and "alarms/{id}"; slice the id out
+                # directly rather than split() into a list of parts
+                if topic.startswith("sensors/") and topic.endswith("/data"):
+                    # Handle sensor data
+                    sensor_id = topic[8:-5]
+                    new_sensor_meta = store_sensor_data(sensor_id, payload, ts_ns)
+                    updates.append((sensor_id, payload, ts_ns))
+                    if new_sensor_meta is not None:
+                        new_sensors.append(new_sensor_meta)
+                elif topic.startswith("alarms/"):
+                    # Handle alarms
+                    sensor_id = topic[7:]
+                    new_alarms.append(store_alarm(sensor_id, payload, ts_ns))
+            except Exception as e:
+                logger.warning("Error processing MQTT message: %s (topic: %s, payload: %s)", e, topic, payload)
+
+    # Queue for the next batched emit to frontend
+    with pending_lock:
+        pending_updates.extend(updates)
+    # Newly observed sensors get a dedicated event so frontends can react to
+    # a sensor coming online (e.g., add to lists immediately).
+    for new_sensor_meta in new_sensors:
+        new_sensor_meta['first_seen'] = format_timestamp(new_sensor_meta['first_seen'])
+        queue_emit('sensor_connected', new_sensor_meta)
+    for alarm in new_alarms:
+        alarm_json = serialize_alarm(alarm)
+        queue_emit('alarm_update', {
+            'sensor_id': alarm_json['sensor_id'],
+            'alarm': alarm_json,
+            'timestamp': alarm_json['timestamp']
         })
 
-    # Emit to frontend via WebSocket
-    socketio.emit('sensor_update', {
-        'sensor_id': sensor_id,
-        'data': data,
-        'timestamp': timestamp
-    })
-    # If this was a newly observed sensor, emit a dedicated event so frontends
-    # can react to a sensor coming online (e.g., add to lists immediately).
-    if new_sensor_meta is not None:
+def queue_emit(event, data):
+    """Queue a WebSocket event for the emit worker, dropping the oldest if full"""
+    while True:
+        try:
+            emit_queue.put_nowait((event, data))
+            return
+        except queue.Full:
+            try:
+                emit_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+def emit_worker():
+    """Emit queued WebSocket events so slow clients never stall MQTT ingest"""
+    while True:
+        event, data = emit_queue.get()
+        try:
+            socketio.emit(event, data)
+            logger.debug("Emitted %s", event)
+        except Exception as e:
+            logger.warning("Failed to emit %s event: %s", event, e)
+
+def ingest_worker():
+    """Drain the MQTT ingest queue in batches"""
+    while True:
         try:
-            new_sensor_meta['first_seen'] = timestamp
-            socketio.emit('sensor_connected', new_sensor_meta)
-            print(f"Emitted sensor_connected for {sensor_id}")
+            process_ingest_batch(drain_ingest_queue())
         except Exception as e:
-            print(f"Failed to emit sensor_connected event: {e}")
-
-def handle_alarm(sensor_id, alarm_data):
-    """Store alarm in memory and emit to frontend"""
-    global alarms, alarm_id_counter
-    timestamp = datetime.now().isoformat()
-    with data_lock:
-        alarm = {
-            'id': alarm_id_counter,
+            logger.exception("Error processing MQTT batch: %s", e)
+
+def handle_sensor_data(sensor_id, data, ts_ns,
+                       _sensors=sensors, _sensor_data=sensor_data,
+                       _RingBuf=RingBuf, _reading_value=reading_value):
+    """Store sensor data in memory; caller holds the data_lock write lock.
+
+    Returns metadata for a newly observed sensor, otherwise None. The
+    stores are never rebound, so they are bound as default arguments to
+    make the per-reading lookups local instead of global.
+    """
+    global today_readings_count, today_start_ns, tomorrow_start_ns, active_sensor_count
+    global sensors_response_cache
+    value = _reading_value(data.get('value', 0))
+    new_sensor_meta = None
+    # Insert or update sensor
+    if sensor_id not in _sensors:
+        sensor = _sensors[sensor_id] = {
             'sensor_id': sensor_id,
-            'alarm_type': alarm_data.get('type', 'unknown'),
-            'level': alarm_data.get('level', 'info'),
-            'message': alarm_data.get('message', ''),
-            'timestamp': timestamp,
-            'acknowledged': False
+            'sensor_type': data.get('type', 'unknown'),
+            'location': data.get('location', 'unknown'),
+            'status': 'active'
         }
-        # newest first: appendleft
-        alarms.appendleft(alarm)
-        alarm_id_counter += 1
+        active_sensor_count += 1
+        sensors_response_cache = None
+        # capture metadata to broadcast after releasing lock
+        new_sensor_meta = dict(sensor, first_seen=ts_ns)
+
+    # Append sensor data into a bounded ring buffer
+    buf = _sensor_data.get(sensor_id)
+    if buf is None:
+        buf = _sensor_data[sensor_id] = _RingBuf()
+    buf.append(value, ts_ns)
 
-    # Emit to frontend via WebSocket
-    socketio.emit('alarm_update', {
+    # Count readings for today, resetting when the date rolls over
+    if ts_ns >= tomorrow_start_ns:
+        today_start_ns, tomorrow_start_ns = day_bounds_ns(ts_ns)
+        today_readings_count = 0
+    today_readings_count += 1
+    return new_sensor_meta
+
+def handle_alarm(sensor_id, alarm_data, ts_ns):
+    """Store alarm in memory; caller holds the data_lock write lock. Returns the alarm."""
+    global alarm_id_counter
+    alarm = {
+        'id': alarm_id_counter,
         'sensor_id': sensor_id,
-        'alarm': alarm,
-        'timestamp': timestamp
-    })
+        'alarm_type': alarm_data.get('type', 'unknown'),
+        'level': alarm_data.get('level', 'info'),
+        'message': alarm_data.get('message', ''),
+        'timestamp': ts_ns,
+        'acknowledged': False
+    }
+    unack, ack = unack_alarms, ack_alarms
+    # Evict the oldest alarm ourselves so the id index stays in sync
+    if len(unack) + len(ack) == ALARMS_MAXLEN:
+        if not ack or (unack and unack[-1]['id'] < ack[-1]['id']):
+            evicted = unack.pop()
+        else:
+            evicted = ack.pop()
+        del alarms_by_id[evicted['id']]
+    # newest first: appendleft
+    unack.appendleft(alarm)
+    alarms_by_id[alarm['id']] = alarm
+    alarm_id_counter += 1
+    return alarm
+
+def serialize_alarm(alarm):
+    """Return a JSON-ready copy of an alarm with its timestamp formatted"""
+    return dict(alarm, timestamp=format_timestamp(alarm['timestamp']))
+
+def flush_sensor_updates():
+    """Emit all pending sensor updates to frontend as a single event"""
+    global pending_updates
+    with pending_lock:
+        if not pending_updates:
+            return
+        batch = pending_updates
+        pending_updates = deque(maxlen=PENDING_UPDATES_MAXLEN)
+    timestamps = format_timestamps(np.fromiter((u[2] for u in batch), dtype=np.int64, count=len(batch)))
+    socketio.emit('sensor_update_batch', [
+        {'sensor_id': sensor_id, 'data': data, 'timestamp': timestamp}
+        for (sensor_id, data, _), timestamp in zip(batch, timestamps)
+    ])
+
+def sensor_update_flusher():
+    """Background task flushing pending sensor updates periodically"""
+    while True:
+        socketio.sleep(UPDATE_FLUSH_INTERVAL)
+        try:
+            flush_sensor_updates()
+        except Exception as e:
+            logger.warning("Failed to emit sensor_update_batch event: %s", e)
 
 # Initialize MQTT client
 mqtt_client = mqtt.Client()
@@ -140,13 +436,13 @@ mqtt_client.on_message = on_message
 def start_mqtt():
     """Start MQTT client in a separate thread"""
     try:
-        print(f"Attempting to connect to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
+        logger.info("Attempting to connect to MQTT broker at %s:%s", MQTT_BROKER, MQTT_PORT)
         mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
-        print("MQTT client connect() called, starting loop...")
+        logger.info("MQTT client connect() called, starting loop...")
         mqtt_client.loop_forever()
     except Exception as e:
-        print(f"MQTT connection error: {e}")
-        print("Note: MQTT broker not available. Dashboard will work without real-time sensor data.")
+        logger.warning("MQTT connection error: %s", e)
+        logger.warning("Note: MQTT broker not available. Dashboard will work without real-time sensor data.")
 
 # API Routes
 @app.route('/health', methods=['GET'])
@@ -169,101 +465,142 @@ def health_check():
 @app.route('/api/sensors', methods=['GET'])
 def get_sensors():
     """Get all sensors"""
-    with data_lock:
-        result = [
-            {
-                'sensor_id': s['sensor_id'],
-                'sensor_type': s.get('sensor_type'),
-                'location': s.get('location'),
-                'status': s.get('status', 'active')
-            }
-            for s in sensors.values()
-        ]
-    return jsonify(result)
+    global sensors_response_cache
+    body = sensors_response_cache
+    if body is None:
+        # Sensor metadata only changes when a new sensor appears, so rebuild
+        # the response once and serve the cached bytes until then
+        with data_lock.read_lock():
+            result = [
+                {
+                    'sensor_id': s['sensor_id'],
+                    'sensor_type': s.get('sensor_type'),
+                    'location': s.get('location'),
+                    'status': s.get('status', 'active')
+                }
+                for s in sensors.values()
+            ]
+            body = orjson.dumps(result)
+            # set under the lock so an invalidation cannot be overwritten by a stale list
+            sensors_response_cache = body
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/sensors/<sensor_id>/data', methods=['GET'])
 def get_sensor_data(sensor_id):
     """Get sensor data with optional time range"""
     limit = request.args.get('limit', 100, type=int)
-    with data_lock:
-        entries = list(sensor_data.get(sensor_id, []))
+    with data_lock.read_lock():
+        # entries are appended chronologically: return most recent first
+        buf = sensor_data.get(sensor_id)
+        if buf is None:
+            return jsonify([])
+        values, ts_ns = buf.latest(limit)
 
-    # return most recent first
-    entries = sorted(entries, key=lambda e: e['timestamp'], reverse=True)
-    return jsonify(entries[:limit])
+    entries = [
+        {'value': v, 'timestamp': t}
+        for v, t in zip(values.tolist(), format_timestamps(ts_ns))
+    ]
+    return jsonify(entries)
 
 @app.route('/api/alarms', methods=['GET'])
 def get_alarms():
     """Get all alarms"""
     limit = request.args.get('limit', 50, type=int)
     acknowledged = request.args.get('acknowledged', None)
-    with data_lock:
-        filtered = list(alarms)
+    limit = max(limit, 0)
+    with data_lock.read_lock():
+        # both deques are stored newest-first
+        if acknowledged is None:
+            newest = heapq.merge(unack_alarms, ack_alarms, key=itemgetter('id'), reverse=True)
+        elif acknowledged.lower() == 'true':
+            newest = ack_alarms
+        else:
+            newest = unack_alarms
+        filtered = list(itertools.islice(newest, limit))
 
-    if acknowledged is not None:
-        want = acknowledged.lower() == 'true'
-        filtered = [a for a in filtered if a.get('acknowledged', False) == want]
-
-    # alarms are stored newest-first
-    return jsonify(filtered[:limit])
+    return jsonify([serialize_alarm(a) for a in filtered])
 
 @app.route('/api/alarms/<int:alarm_id>/acknowledge', methods=['POST'])
 def acknowledge_alarm(alarm_id):
     """Acknowledge an alarm"""
-    with data_lock:
-        for a in alarms:
-            if a['id'] == alarm_id:
+    with data_lock.write_lock():
+        a = alarms_by_id.get(alarm_id)
+        if a is not None:
+            if not a['acknowledged']:
                 a['acknowledged'] = True
-                return jsonify({'status': 'success', 'message': 'Alarm acknowledged'})
+                unack_alarms.remove(a)
+                # keep ack_alarms newest-first; recent alarms land near the front
+                pos = next((i for i, x in enumerate(ack_alarms) if x['id'] < alarm_id), len(ack_alarms))
+                ack_alarms.insert(pos, a)
+                stats_cache['value'] = None
+            return jsonify({'status': 'success', 'message': 'Alarm acknowledged'})
 
     return jsonify({'status': 'error', 'message': 'Alarm not found'}), 404
 
 @app.route('/api/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
     """Get dashboard statistics"""
-    now = datetime.now()
-    today = now.date()
-    with data_lock:
-        active_sensors = sum(1 for s in sensors.values() if s.get('status', 'active') == 'active')
-        unack_alarms = sum(1 for a in alarms if not a.get('acknowledged', False))
-        today_readings = 0
-        for entries in sensor_data.values():
-            for e in list(entries):
-                try:
-                    ts = datetime.fromisoformat(e['timestamp'])
-                    if ts.date() == today:
-                        today_readings += 1
-                except Exception:
-                    # ignore parse errors
-                    pass
-
-    return jsonify({
-        'active_sensors': active_sensors,
-        'unacknowledged_alarms': unack_alarms,
-        'today_readings': today_readings
-    })
+    bucket = int(time.monotonic() // STATS_CACHE_TTL)
+    cached = stats_cache['value']
+    if cached is not None and stats_cache['bucket'] == bucket:
+        return jsonify(cached)
+
+    with data_lock.read_lock():
+        active_sensors = active_sensor_count
+        unack_count = len(unack_alarms)
+        # no reading arrived since midnight if the counter is still on an older day
+        today_readings = today_readings_count if today_start_ns <= time.time_ns() < tomorrow_start_ns else 0
+        stats = {
+            'active_sensors': active_sensors,
+            'unacknowledged_alarms': unack_count,
+            'today_readings': today_readings
+        }
+        # stored under the lock so a concurrent acknowledge cannot be overwritten by stale stats
+        stats_cache['bucket'] = bucket
+        stats_cache['value'] = stats
+
+    return jsonify(stats)
 
 # WebSocket events
 @socketio.on('connect')
 def handle_connect():
-    print('Client connected')
+    logger.info('Client connected')
     emit('status', {'message': 'Connected to SHIELD Dashboard'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print('Client disconnected')
+    logger.info('Client disconnected')
 
 if __name__ == '__main__':
+    # WARNING by default so per-message logging costs nothing; LOG_LEVEL=DEBUG to trace
+    logging.basicConfig(
+        level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
     # Initialize in-memory stores
-    print("Initializing in-memory data stores...")
+    logger.info("Initializing in-memory data stores...")
     init_data()
 
     # Start MQTT client in a separate thread
-    print("Starting MQTT client thread...")
+    logger.info("Starting MQTT client thread...")
     mqtt_thread = threading.Thread(target=start_mqtt, daemon=True)
     mqtt_thread.start()
-    print("MQTT thread started")
+    logger.info("MQTT thread started")
+
+    # Store queued MQTT messages in batches
+    ingest_thread = threading.Thread(target=ingest_worker, daemon=True)
+    ingest_thread.start()
+
+    # Emit sensor_connected/alarm_update events off the ingest thread. This is a
+    # plain thread rather than a socketio background task because it blocks on
+    # emit_queue.get(), which would stall an un-monkey-patched eventlet hub.
+    emit_thread = threading.Thread(target=emit_worker, daemon=True)
+    emit_thread.start()
+
+    # Batch sensor updates to WebSocket clients
+    socketio.start_background_task(sensor_update_flusher)
 
     # Start Flask-SocketIO server (disable debug to avoid reloader issues)
-    print("Starting Flask-SocketIO server...")
+    logger.info("Starting Flask-SocketIO server...")
     socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
@@ -50,7 +50,7 @@ if [[ -n "$APPIMAGE" ]] || [[ "$SCRIPT_DIR" == /tmp/.mount_* ]]; then
         # Install requirements
         echo "Installing Python dependencies..."
         pip install --upgrade pip
-        pip install Flask==2.3.3 Flask-CORS==4.0.0 Flask-SocketIO==5.3.6 paho-mqtt==1.6.1 python-socketio==5.8.0 eventlet==0.33.3
+        pip install Flask==2.3.3 Flask-CORS==4.0.0 Flask-SocketIO==5.3.6 paho-mqtt==1.6.1 python-socketio==5.8.0 eventlet==0.33.3 numpy==1.24.4 orjson==3.9.10
     fi
 else
     # Running in development environment
@@ -66,7 +66,7 @@ else
     else
         echo "Warning: No virtual environment found. Installing packages globally..."
         # Install required packages if not present
-        python3 -m pip install Flask==2.3.3 Flask-CORS==4.0.0 Flask-SocketIO==5.3.6 paho-mqtt==1.6.1 python-socketio==5.8.0 eventlet==0.33.3 --user --quiet 2>/dev/null || true
+        python3 -m pip install Flask==2.3.3 Flask-CORS==4.0.0 Flask-SocketIO==5.3.6 paho-mqtt==1.6.1 python-socketio==5.8.0 eventlet==0.33.3 numpy==1.24.4 orjson==3.9.10 --user --quiet 2>/dev/null || true
     fi
 fi
 
@@ -74,7 +74,7 @@ fi
 if ! python3 -c "import flask" 2>/dev/null; then
     echo "Error: Flask is not available. Installation may have failed."
     echo "Please install the required dependencies manually:"
-    echo "pip install Flask Flask-CORS Flask-SocketIO paho-mqtt python-socketio eventlet"
+    echo "pip install Flask Flask-CORS Flask-SocketIO paho-mqtt python-socketio eventlet numpy orjson"
     exit 1
 fi
 
@@ -89,8 +89,9 @@ class API {
             this._updateConnectionStatus('disconnected', 'Disconnected');
         });
 
-        this.socket.on('sensor_update', (data) => {
-            this._emit('sensorUpdate', data);
+        // Backend coalesces sensor updates into periodic batches
+        this.socket.on('sensor_update_batch', (batch) => {
+            batch.forEach(data => this._emit('sensorUpdate', data));
         });
 
         this.socket.on('alarm_update', (data) => {
@@ -4,12 +4,14 @@ Simple test script to generate mock sensor data and alarms for testing the SHIEL
 This script publishes test data to MQTT topics that the dashboard backend subscribes to.
 """
 
-import json
 import time
 import random
 import threading
 from datetime import datetime
+import numpy as np
+import orjson
 import paho.mqtt.client as mqtt
+import paho.mqtt.publish as publish
 
 # MQTT Configuration
 MQTT_BROKER = "localhost"
@@ -25,10 +27,33 @@ SENSORS = [
     {"id": "STRESS_002", "type": "stress", "location": "Building C - Pillar 2"},
 ]
 
+# Value generation per sensor type: value = clip(uniform(base) + uniform(noise), 0, max)
+VALUE_RANGES = {
+    # Humidity: 0-100%, normal range 30-70%
+    "humidity": {"base": (35, 65), "noise": (-5, 5), "max": 100},
+    # Vibration: 0-100 Hz, normal range 0-20 Hz; noise skewed for occasional spikes
+    "vibration": {"base": (0, 15), "noise": (-2, 8), "max": None},
+    # Stress: 0-100 MPa, normal range 0-50 MPa
+    "stress": {"base": (10, 45), "noise": (-5, 10), "max": None},
+}
+
+# Inclusive (low, high) value ranges that raise an alarm, checked critical first
+ALARM_THRESHOLDS = {
+    "humidity": {"warning": (70, 80), "critical": (80, 100)},
+    "vibration": {"warning": (20, 50), "critical": (50, 100)},
+    "stress": {"warning": (60, 80), "critical": (80, 100)}
+}
+
 class MockSensorDataGenerator:
     def __init__(self):
         self.client = mqtt.Client()
         self.running = False
+        self.rng = np.random.default_rng()
+        # Fixed per-sensor fields serialized once: '{"type":...,"location":...,'
+        self.payload_prefixes = {
+            sensor["id"]: orjson.dumps({"type": sensor["type"], "location": sensor["location"]})[:-1] + b","
+            for sensor in SENSORS
+        }
         
     def connect(self):
         """Connect to MQTT broker"""
@@ -50,38 +75,31 @@ class MockSensorDataGenerator:
         
     def generate_sensor_value(self, sensor_type):
         """Generate realistic sensor values based on type"""
-        if sensor_type == "humidity":
-            # Humidity: 0-100%, normal range 30-70%
-            base = random.uniform(35, 65)
-            noise = random.uniform(-5, 5)
-            return max(0, min(100, base + noise))
+        ranges = VALUE_RANGES.get(sensor_type)
+        if ranges is None:
+            return random.uniform(0, 100)
             
-        elif sensor_type == "vibration":
-            # Vibration: 0-100 Hz, normal range 0-20 Hz
-            base = random.uniform(0, 15)
-            noise = random.uniform(-2, 8)  # Occasional spikes
-            return max(0, base + noise)
-            
-        elif sensor_type == "stress":
-            # Stress: 0-100 MPa, normal range 0-50 MPa
-            base = random.uniform(10, 45)
-            noise = random.uniform(-5, 10)
-            return max(0, base + noise)
+        value = max(0, random.uniform(*ranges["base"]) + random.uniform(*ranges["noise"]))
+        if ranges["max"] is not None:
+            value = min(ranges["max"], value)
+        return value
+    
+    def generate_sensor_values(self, sensor_type, count):
+        """Generate `count` sensor values at once as a NumPy array"""
+        ranges = VALUE_RANGES.get(sensor_type)
+        if ranges is None:
+            return self.rng.uniform(0, 100, size=count)
             
-        return random.uniform(0, 100)
+        base = self.rng.uniform(*ranges["base"], size=count)
+        noise = self.rng.uniform(*ranges["noise"], size=count)
+        return np.clip(base + noise, 0, ranges["max"])
     
     def should_generate_alarm(self, value, sensor_type):
         """Determine if an alarm should be generated based on sensor value"""
-        thresholds = {
-            "humidity": {"warning": (70, 80), "critical": (80, 100)},
-            "vibration": {"warning": (20, 50), "critical": (50, 100)},
-            "stress": {"warning": (60, 80), "critical": (80, 100)}
-        }
-        
-        if sensor_type not in thresholds:
+        if sensor_type not in ALARM_THRESHOLDS:
             return None
             
-        thresh = thresholds[sensor_type]
+        thresh = ALARM_THRESHOLDS[sensor_type]
         
         if thresh["critical"][0] <= value <= thresh["critical"][1]:
             return "critical"
@@ -90,22 +108,50 @@ class MockSensorDataGenerator:
             
         return None
     
+    def classify_alarm_levels(self, values, sensor_type):
+        """Vectorized should_generate_alarm: alarm level per value, '' where none"""
+        if sensor_type not in ALARM_THRESHOLDS:
+            return np.full(len(values), "")
+            
+        thresh = ALARM_THRESHOLDS[sensor_type]
+        critical = (values >= thresh["critical"][0]) & (values <= thresh["critical"][1])
+        warning = (values >= thresh["warning"][0]) & (values <= thresh["warning"][1])
+        return np.where(critical, "critical", np.where(warning, "warning", ""))
+    
+    def build_sensor_message(self, sensor, value):
+        """Build (topic, payload) for a sensor reading from the pre-serialized sensor fields"""
+        prefix = self.payload_prefixes.get(sensor["id"])
+        if prefix is None:
+            prefix = orjson.dumps({"type": sensor["type"], "location": sensor["location"]})[:-1] + b","
+        # '{"value":...,"timestamp":...}' minus its opening brace completes the object
+        reading = orjson.dumps({"value": round(value, 2), "timestamp": datetime.now().isoformat()})
+        return f"sensors/{sensor['id']}/data", prefix + reading[1:]
+
+    def build_alarm_message(self, sensor, level, value):
+        """Build (topic, payload, message) for an alarm"""
+        messages = {
+            "warning": f"{sensor['type'].title()} level elevated: {value:.2f}",
+            "critical": f"CRITICAL: {sensor['type'].title()} threshold exceeded: {value:.2f}"
+        }
+        message = messages.get(level, f"Alarm triggered: {value:.2f}")
+        
+        alarm_data = {
+            "type": "threshold",
+            "level": level,
+            "message": message,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        return f"alarms/{sensor['id']}", orjson.dumps(alarm_data), message
+
     def publish_sensor_data(self, sensor, value=None, manual=False):
         """Publish sensor data to MQTT. If value is provided, use it (manual mode)."""
         if value is None:
             value = self.generate_sensor_value(sensor["type"])
         
-        data = {
-            "type": sensor["type"],
-            "value": round(value, 2),
-            "location": sensor["location"],
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        topic = f"sensors/{sensor['id']}/data"
-        payload = json.dumps(data)
+        topic, payload = self.build_sensor_message(sensor, value)
         
-        self.client.publish(topic, payload)
+        self.client.publish(topic, payload, qos=0, retain=False)
         if manual:
             print(f"[MANUAL] Published {sensor['id']}: {value:.2f}")
         else:
@@ -118,24 +164,11 @@ class MockSensorDataGenerator:
     
     def publish_alarm(self, sensor, level, value, manual=False):
         """Publish alarm to MQTT"""
-        messages = {
-            "warning": f"{sensor['type'].title()} level elevated: {value:.2f}",
-            "critical": f"CRITICAL: {sensor['type'].title()} threshold exceeded: {value:.2f}"
-        }
-        
-        alarm_data = {
-            "type": "threshold",
-            "level": level,
-            "message": messages.get(level, f"Alarm triggered: {value:.2f}"),
-            "timestamp": datetime.now().isoformat()
-        }
+        topic, payload, message = self.build_alarm_message(sensor, level, value)
         
-        topic = f"alarms/{sensor['id']}"
-        payload = json.dumps(alarm_data)
-        
-        self.client.publish(topic, payload)
+        self.client.publish(topic, payload, qos=0, retain=False)
         prefix = "[MANUAL] " if manual else ""
-        print(f"{prefix}🚨 ALARM {sensor['id']} ({level.upper()}): {alarm_data['message']}")
+        print(f"{prefix}🚨 ALARM {sensor['id']} ({level.upper()}): {message}")
     
     def run_continuous(self, interval=5):
         """Run continuous data generation"""
@@ -161,12 +194,34 @@ class MockSensorDataGenerator:
         """Generate a burst of test data"""
         print(f"Generating {count} data points for each sensor...")
         
+        # Generate each sensor's values and alarm levels for the whole burst up front
+        values = {}
+        levels = {}
+        for sensor in SENSORS:
+            sensor_values = self.generate_sensor_values(sensor["type"], count)
+            values[sensor["id"]] = sensor_values.tolist()
+            levels[sensor["id"]] = self.classify_alarm_levels(sensor_values, sensor["type"]).tolist()
+        
+        # Build every message up front, then send them all over one connection
+        msgs = []
+        alarm_count = 0
         for i in range(count):
             for sensor in SENSORS:
-                self.publish_sensor_data(sensor)
-            time.sleep(1)
+                value = values[sensor["id"]][i]
+                topic, payload = self.build_sensor_message(sensor, value)
+                msgs.append((topic, payload, 0, False))
+                alarm_level = levels[sensor["id"]][i]
+                if alarm_level:
+                    topic, payload, _ = self.build_alarm_message(sensor, alarm_level, value)
+                    msgs.append((topic, payload, 0, False))
+                    alarm_count += 1
         
-        print("Burst generation complete")
+        try:
+            publish.multiple(msgs, hostname=MQTT_BROKER, port=MQTT_PORT)
+        except Exception as e:
+            print(f"Failed to publish burst: {e}")
+            return
+        print(f"Burst generation complete: {len(msgs) - alarm_count} readings, {alarm_count} alarms")
 
 def manual_mode(generator):
     print("\nManual Data/Alarm Sending Mode")